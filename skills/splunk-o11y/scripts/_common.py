@@ -0,0 +1,102 @@
+"""
+Shared helpers for the Splunk Observability Cloud scripts.
+
+Imported by get_topology.py, get_trace.py and get_service_metrics.py; not meant
+to be run directly. Holds the JSON encode/decode helpers (orjson when installed,
+otherwise the stdlib json module), stdout output, HTTP error formatting and the
+pooled requests session setup.
+"""
+
+import json
+import sys
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def dumps_pretty(obj) -> bytes:
+    """
+    Serialize an object as JSON indented with two spaces.
+
+    Both backends write non-ASCII characters as raw UTF-8, so the output does
+    not depend on whether orjson is installed.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        Indented JSON as UTF-8 bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+
+
+def dumps_line(obj) -> bytes:
+    """
+    Serialize an object as compact single-line JSON.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        JSON bytes without newlines, suitable for an NDJSON record
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def write_output(data: bytes) -> None:
+    """
+    Write pre-encoded output to stdout, ending it with a newline.
+
+    Args:
+        data: UTF-8 encoded output
+    """
+    sys.stdout.buffer.write(data)
+    if not data.endswith(b"\n"):
+        sys.stdout.buffer.write(b"\n")
+
+
+def format_http_error(e) -> str:
+    """
+    Build an error message for an HTTP error response.
+
+    The body is parsed once from the bytes already held by the response; when
+    it is not JSON, its first 200 characters are shown instead.
+
+    Args:
+        e: requests HTTPError or httpx HTTPStatusError from raise_for_status
+
+    Returns:
+        Error message, including the API's "message" field when present
+    """
+    error_message = f"HTTP error: {e.response.status_code}"
+    try:
+        error_body = json_loads(e.response.content)
+        detail = error_body.get("message", "") if isinstance(error_body, dict) else ""
+    except ValueError:
+        detail = e.response.text[:200]
+    if detail:
+        error_message += f" - {detail}"
+    return error_message
+
+
+def create_requests_session() -> requests.Session:
+    """
+    Create a requests session that pools keep-alive HTTPS connections.
+
+    Returns:
+        Session with an HTTPAdapter mounted for https://
+    """
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+    return session
@@ -22,38 +22,54 @@ Environment variables:
 """
 
 import argparse
-import json
+import array
+import functools
+import math
 import os
 import sys
 from datetime import datetime, timedelta, timezone
 
 import requests
 
+from _common import (
+    create_requests_session,
+    dumps_pretty,
+    format_http_error,
+    json_loads,
+    write_output,
+)
+
+# Below this many values a plain Python sum is faster than importing numpy
+NUMPY_MIN_VALUES = 1000
+
+# Shared session so repeated calls reuse pooled keep-alive connections
+_SESSION = create_requests_session()
+
 METRIC_TYPES = {
     "error-rate": {
         "description": "Error rate per service (%)",
-        "program": (
+        "program_fn": lambda env, svc_filter: (
             "errors = data('service.request.count', "
-            "filter=filter('sf_error', 'true') and filter('sf_environment', '{env}'){svc_filter})"
+            f"filter=filter('sf_error', 'true') and filter('sf_environment', '{env}'){svc_filter})"
             ".sum(by=['sf_service']).publish('errors')\n"
             "total = data('service.request.count', "
-            "filter=filter('sf_environment', '{env}'){svc_filter})"
+            f"filter=filter('sf_environment', '{env}'){svc_filter})"
             ".sum(by=['sf_service']).publish('total')"
         ),
     },
     "latency": {
         "description": "Request duration P99 per service (ms)",
-        "program": (
+        "program_fn": lambda env, svc_filter: (
             "data('service.request.duration.ns.p99', "
-            "filter=filter('sf_environment', '{env}'){svc_filter})"
+            f"filter=filter('sf_environment', '{env}'){svc_filter})"
             ".mean(by=['sf_service']).publish('latency_p99')"
         ),
     },
     "throughput": {
         "description": "Request throughput per service (req/sec)",
-        "program": (
+        "program_fn": lambda env, svc_filter: (
             "data('service.request.count', "
-            "filter=filter('sf_environment', '{env}'){svc_filter})"
+            f"filter=filter('sf_environment', '{env}'){svc_filter})"
             ".sum(by=['sf_service']).publish('throughput')"
         ),
     },
@@ -89,11 +105,10 @@ def build_program(metric_type: str, environment: str, service: str | None) -> st
     svc_filter = ""
     if service:
         svc_filter = f" and filter('sf_service', '{service}')"
-    template = METRIC_TYPES[metric_type]["program"]
-    return template.format(env=environment, svc_filter=svc_filter)
+    return METRIC_TYPES[metric_type]["program_fn"](environment, svc_filter)
 
 
-def parse_sse_stream(response: requests.Response) -> dict:
+def parse_sse_stream(response: requests.Response, chunk_size: int = 65536) -> dict:
     """Parse SSE stream from SignalFlow execute API into structured data.
 
     SignalFlow SSE uses multi-line data fields:
@@ -102,20 +117,25 @@ def parse_sse_stream(response: requests.Response) -> dict:
         data:   "tsId": "abc",
         data:   ...
         data: }
+
+    The stream is read in raw byte chunks and split on newlines here rather
+    than through iter_lines(decode_unicode=True), so only the JSON payloads
+    are ever decoded.
     """
     metadata = {}  # tsid -> metadata
-    data_points = {}  # tsid -> list of (timestamp, value)
+    data_points = {}  # tsid -> array('d') of values, missing values as NaN
     current_event = None
-    data_buffer = []
+    data_buffer = bytearray()
 
     def flush_buffer():
         if not data_buffer or not current_event:
             return
-        raw = "\n".join(data_buffer)
+        raw = bytes(data_buffer)
         data_buffer.clear()
         try:
-            obj = json.loads(raw)
-        except (json.JSONDecodeError, ValueError):
+            obj = json_loads(raw)
+        except ValueError:
+            # json.JSONDecodeError and orjson.JSONDecodeError both subclass ValueError
             return
 
         if current_event == "metadata":
@@ -128,45 +148,93 @@ def parse_sse_stream(response: requests.Response) -> dict:
                 }
         elif current_event == "data":
             raw_data = obj.get("data", [])
-            ts = obj.get("logicalTimestampMs")
             if isinstance(raw_data, list):
                 for item in raw_data:
                     tid = item.get("tsId")
                     value = item.get("value")
                     if tid:
                         if tid not in data_points:
-                            data_points[tid] = []
-                        data_points[tid].append({"timestamp": ts, "value": value})
-
-    for line in response.iter_lines(decode_unicode=True):
-        if line is None or line == "":
+                            data_points[tid] = array.array("d")
+                        data_points[tid].append(math.nan if value is None else value)
+
+    def iter_lines():
+        # bytes.split does the line splitting in C; the last, possibly
+        # incomplete line is carried over to the next chunk
+        tail = b""
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            yield from lines
+        if tail:
+            yield tail
+
+    for line in iter_lines():
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        if not line:
             flush_buffer()
             current_event = None
             continue
-        if line.startswith("event:"):
+        if line.startswith(b"event:"):
             flush_buffer()
-            current_event = line[6:].strip()
+            current_event = line[6:].strip().decode()
             continue
-        if line.startswith("data:"):
-            data_buffer.append(line[5:])
+        if line.startswith(b"data:"):
+            data_buffer.extend(line[5:])
+            data_buffer.extend(b"\n")
 
     flush_buffer()
     return {"metadata": metadata, "data_points": data_points}
 
 
+@functools.cache
+def load_numpy():
+    """Import numpy on first use, or return None if it is not installed."""
+    try:
+        import numpy
+    except ImportError:  # numpy is optional; reductions fall back to pure Python
+        return None
+    return numpy
+
+
+def nan_sum_count(values: array.array) -> tuple[float, int]:
+    """Return the sum and the number of non-NaN entries in values."""
+    np = load_numpy() if len(values) >= NUMPY_MIN_VALUES else None
+    if np is not None:
+        arr = np.frombuffer(values, dtype=np.float64)
+        return float(np.nansum(arr)), int(arr.size - np.isnan(arr).sum())
+    present = [v for v in values if not math.isnan(v)]
+    return float(sum(present)), len(present)
+
+
+def nan_sum_count_all(groups) -> tuple[float, int]:
+    """Return the combined nan_sum_count of several value arrays."""
+    total, count = 0.0, 0
+    for values in groups:
+        group_total, group_count = nan_sum_count(values)
+        total += group_total
+        count += group_count
+    return total, count
+
+
+def as_number(value: float) -> int | float:
+    """Return whole-valued floats as int so counts serialize without a fraction."""
+    return int(value) if value.is_integer() else value
+
+
 def aggregate_results(parsed: dict, metric_type: str) -> list[dict]:
     """Aggregate parsed SSE data into per-service results."""
-    service_data: dict[str, dict[str, list]] = {}
+    service_data: dict[str, dict[str, array.array]] = {}
 
-    for tsid, points in parsed["data_points"].items():
+    for tsid, values in parsed["data_points"].items():
         meta = parsed["metadata"].get(tsid, {})
         svc = meta.get("sf_service", "unknown")
         label = meta.get("label", "")
         if svc not in service_data:
             service_data[svc] = {}
         if label not in service_data[svc]:
-            service_data[svc][label] = []
-        service_data[svc][label].extend(points)
+            service_data[svc][label] = array.array("d")
+        service_data[svc][label].extend(values)
 
     results = []
     for svc, labels in sorted(service_data.items()):
@@ -175,31 +243,25 @@ def aggregate_results(parsed: dict, metric_type: str) -> list[dict]:
         entry: dict = {"service": svc}
 
         if metric_type == "error-rate":
-            errors_vals = [p["value"] for p in labels.get("errors", []) if p["value"] is not None]
-            total_vals = [p["value"] for p in labels.get("total", []) if p["value"] is not None]
-            total_sum = sum(total_vals)
-            error_sum = sum(errors_vals)
+            error_sum, _ = nan_sum_count(labels.get("errors", array.array("d")))
+            total_sum, _ = nan_sum_count(labels.get("total", array.array("d")))
             if total_sum > 0:
                 entry["error_rate_pct"] = round(error_sum / total_sum * 100, 2)
-                entry["error_count"] = error_sum
-                entry["total_count"] = total_sum
+                entry["error_count"] = as_number(error_sum)
+                entry["total_count"] = as_number(total_sum)
             else:
                 entry["error_rate_pct"] = 0.0
                 entry["error_count"] = 0
                 entry["total_count"] = 0
         elif metric_type == "latency":
-            vals = []
-            for label_points in labels.values():
-                vals.extend([p["value"] for p in label_points if p["value"] is not None])
-            if vals:
-                entry["p99_ms"] = round(sum(vals) / len(vals) / 1_000_000, 2)
+            total, count = nan_sum_count_all(labels.values())
+            if count:
+                entry["p99_ms"] = round(total / count / 1_000_000, 2)
         elif metric_type == "throughput":
-            vals = []
-            for label_points in labels.values():
-                vals.extend([p["value"] for p in label_points if p["value"] is not None])
-            if vals:
-                entry["requests_total"] = sum(vals)
-                entry["avg_per_interval"] = round(sum(vals) / len(vals), 2)
+            total, count = nan_sum_count_all(labels.values())
+            if count:
+                entry["requests_total"] = as_number(total)
+                entry["avg_per_interval"] = round(total / count, 2)
 
         results.append(entry)
 
@@ -243,17 +305,12 @@ def main():
     body = {"programText": program}
 
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             url, headers=headers, params=params, json=body, stream=True, timeout=60
         )
         resp.raise_for_status()
     except requests.exceptions.HTTPError as e:
-        msg = f"HTTP error: {e.response.status_code}"
-        try:
-            msg += f" - {e.response.json().get('message', '')}"
-        except Exception:
-            pass
-        print(f"Error: {msg}", file=sys.stderr)
+        print(f"Error: {format_http_error(e)}", file=sys.stderr)
         sys.exit(1)
     except requests.exceptions.RequestException as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -272,7 +329,7 @@ def main():
         },
         "results": results,
     }
-    print(json.dumps(output, indent=2))
+    write_output(dumps_pretty(output))
 
 
 if __name__ == "__main__":
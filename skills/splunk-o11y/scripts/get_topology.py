@@ -15,13 +15,15 @@ Usage:
     # Get dependencies for a specific service
     python get_topology.py --environment production --service my-service
 
+    # Pass the API response through unformatted (e.g. when piping to jq)
+    python get_topology.py --environment production --raw
+
 Environment variables:
     SF_TOKEN: Splunk Observability Cloud API token (required)
     SF_REALM: Splunk realm (default: us1)
 """
 
 import argparse
-import json
 import os
 import sys
 from datetime import datetime, timedelta, timezone
@@ -29,6 +31,17 @@ from urllib.parse import quote
 
 import requests
 
+from _common import (
+    create_requests_session,
+    dumps_pretty,
+    format_http_error,
+    json_loads,
+    write_output,
+)
+
+# Shared session so repeated calls reuse pooled keep-alive connections
+_SESSION = create_requests_session()
+
 
 def parse_args():
     """Parse command line arguments."""
@@ -52,6 +65,11 @@ def parse_args():
         "--service",
         help="Service name to get dependencies for (optional)",
     )
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Output the API response as-is without re-indenting",
+    )
     return parser.parse_args()
 
 
@@ -91,7 +109,7 @@ def get_topology(
     environment: str,
     time_range: str,
     service_name: str | None = None,
-) -> dict:
+) -> bytes:
     """
     Call the APM Service Topology API.
 
@@ -103,7 +121,7 @@ def get_topology(
         service_name: Optional service name for dependency lookup
 
     Returns:
-        API response as dictionary
+        Raw API response body (JSON bytes)
 
     Raises:
         requests.exceptions.RequestException: On API errors
@@ -132,10 +150,10 @@ def get_topology(
         ],
     }
 
-    response = requests.post(url, headers=headers, json=payload, timeout=30)
+    response = _SESSION.post(url, headers=headers, json=payload, timeout=30)
     response.raise_for_status()
 
-    return response.json()
+    return response.content
 
 
 def main():
@@ -159,23 +177,15 @@ def main():
 
     # Call API
     try:
-        result = get_topology(
+        content = get_topology(
             token=token,
             realm=realm,
             environment=args.environment,
             time_range=time_range,
             service_name=args.service,
         )
-        print(json.dumps(result, indent=2))
     except requests.exceptions.HTTPError as e:
-        error_message = f"HTTP error: {e.response.status_code}"
-        try:
-            error_body = e.response.json()
-            if "message" in error_body:
-                error_message += f" - {error_body['message']}"
-        except (ValueError, KeyError):
-            pass
-        print(f"Error: {error_message}", file=sys.stderr)
+        print(f"Error: {format_http_error(e)}", file=sys.stderr)
         sys.exit(1)
     except requests.exceptions.ConnectionError:
         print(f"Error: Could not connect to Splunk API (realm: {realm})", file=sys.stderr)
@@ -187,6 +197,17 @@ def main():
         print(f"Error: Request failed: {e}", file=sys.stderr)
         sys.exit(1)
 
+    if args.raw:
+        # Pass the body through without a decode/re-encode round-trip
+        write_output(content)
+        return
+
+    try:
+        write_output(dumps_pretty(json_loads(content)))
+    except ValueError:
+        # If response is not valid JSON, output raw text
+        write_output(content)
+
 
 if __name__ == "__main__":
     main()
@@ -14,12 +14,17 @@ Usage:
     # Get specific segment by timestamp
     python get_trace.py <trace_id> --segment-timestamp 1704067200000000
 
+    # Get every segment (fetched in parallel, one NDJSON line per segment)
+    python get_trace.py <trace_id> --all-segments
+
     # Output in NDJSON format
     python get_trace.py <trace_id> --format ndjson
 
 Environment variables:
     SF_TOKEN: Splunk Observability Cloud API token (required)
     SF_REALM: Splunk realm (default: us1)
+    SF_USE_HTTP2: Set to 1 to send requests over HTTP/2 with httpx
+        (optional, requires `pip install httpx[http2]`)
 
 API Response (Span object fields):
     - traceId, spanId, parentId, serviceName, operationName
@@ -28,12 +33,81 @@ API Response (Span object fields):
 """
 
 import argparse
-import json
 import os
 import sys
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 
+from _common import (
+    create_requests_session,
+    dumps_line,
+    dumps_pretty,
+    format_http_error,
+    json_loads,
+    write_output,
+)
+
+try:
+    import httpx
+except ImportError:  # httpx is optional; only used when SF_USE_HTTP2 is set
+    httpx = None
+
+# Exceptions raised by either HTTP backend, grouped the way main() reports them
+_HTTP_STATUS_ERRORS: tuple[type[Exception], ...] = (requests.exceptions.HTTPError,)
+_CONNECT_ERRORS: tuple[type[Exception], ...] = (requests.exceptions.ConnectionError,)
+_TIMEOUT_ERRORS: tuple[type[Exception], ...] = (requests.exceptions.Timeout,)
+_REQUEST_ERRORS: tuple[type[Exception], ...] = (requests.exceptions.RequestException,)
+if httpx is not None:
+    _HTTP_STATUS_ERRORS += (httpx.HTTPStatusError,)
+    _CONNECT_ERRORS += (httpx.ConnectError,)
+    _TIMEOUT_ERRORS += (httpx.TimeoutException,)
+    _REQUEST_ERRORS += (httpx.HTTPError,)
+
+# Response type of whichever backends are importable
+Response = requests.Response
+if httpx is not None:
+    Response = requests.Response | httpx.Response
+
+
+def create_session():
+    """
+    Create the HTTP client shared by all trace API calls.
+
+    With SF_USE_HTTP2=1 and httpx (with h2) installed, an HTTP/2 httpx.Client
+    is returned so concurrent --all-segments requests are multiplexed over a
+    single connection. Otherwise a pooled requests.Session is used; if
+    SF_USE_HTTP2 is set but httpx or h2 is missing, a warning is printed.
+
+    Returns:
+        httpx.Client or requests.Session
+    """
+    use_http2 = os.environ.get("SF_USE_HTTP2", "").lower() in ("1", "true", "yes")
+    if use_http2 and httpx is None:
+        print("Warning: httpx is not installed, falling back to HTTP/1.1", file=sys.stderr)
+    elif use_http2:
+        try:
+            return httpx.Client(
+                http2=True,
+                timeout=60,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=32),
+            )
+        except ImportError:
+            # httpx is installed without the h2 package
+            print("Warning: h2 is not installed, falling back to HTTP/1.1", file=sys.stderr)
+
+    return create_requests_session()
+
+
+# Module-level client: connections are pooled (or multiplexed) across requests
+_SESSION = create_session()
+
+# Accept headers per output format, shared by the endpoint functions
+_HDR_JSON = {"Accept": "application/json"}
+_HDR_NDJSON = {"Accept": "application/x-ndjson"}
+
 
 def parse_args():
     """Parse command line arguments."""
@@ -58,6 +132,11 @@ def parse_args():
         metavar="TIMESTAMP",
         help="Get specific segment by timestamp (int64 microseconds)",
     )
+    endpoint_group.add_argument(
+        "--all-segments",
+        action="store_true",
+        help="Get every segment in parallel, output as NDJSON (one line per segment)",
+    )
     endpoint_group.add_argument(
         "--latest",
         action="store_true",
@@ -68,26 +147,30 @@ def parse_args():
     parser.add_argument(
         "--format",
         choices=["json", "ndjson"],
-        default="json",
         help="Output format (default: json)",
     )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.all_segments and args.format == "json":
+        parser.error("--all-segments always outputs NDJSON; --format json is not supported")
+    if args.format is None:
+        args.format = "json"
+    return args
 
 
-def get_accept_header(output_format: str) -> str:
+def _headers(token: str, output_format: str) -> dict[str, str]:
     """
-    Get the Accept header value for the specified output format.
+    Build request headers for a trace API call.
 
     Args:
+        token: Splunk Observability Cloud API token
         output_format: Output format (json or ndjson)
 
     Returns:
-        Accept header value
+        Accept and X-SF-Token headers
     """
-    if output_format == "ndjson":
-        return "application/x-ndjson"
-    return "application/json"
+    accept = _HDR_NDJSON if output_format == "ndjson" else _HDR_JSON
+    return {**accept, "X-SF-Token": token}
 
 
 def get_trace_segments(
@@ -95,7 +178,7 @@ def get_trace_segments(
     realm: str,
     trace_id: str,
     output_format: str,
-) -> requests.Response:
+) -> Response:
     """
     Get list of segments for a trace.
 
@@ -109,16 +192,13 @@ def get_trace_segments(
         API response
 
     Raises:
-        requests.exceptions.RequestException: On API errors
+        requests.exceptions.RequestException or httpx.HTTPError: On API errors
     """
     url = f"https://api.{realm}.signalfx.com/v2/apm/trace/{trace_id}/segments"
 
-    headers = {
-        "X-SF-Token": token,
-        "Accept": get_accept_header(output_format),
-    }
+    headers = _headers(token, output_format)
 
-    response = requests.get(url, headers=headers, timeout=30)
+    response = _SESSION.get(url, headers=headers, timeout=30)
     return response
 
 
@@ -128,7 +208,7 @@ def get_trace_segment_by_timestamp(
     trace_id: str,
     segment_timestamp: int,
     output_format: str,
-) -> requests.Response:
+) -> Response:
     """
     Get specific segment by timestamp.
 
@@ -143,16 +223,13 @@ def get_trace_segment_by_timestamp(
         API response
 
     Raises:
-        requests.exceptions.RequestException: On API errors
+        requests.exceptions.RequestException or httpx.HTTPError: On API errors
     """
     url = f"https://api.{realm}.signalfx.com/v2/apm/trace/{trace_id}/{segment_timestamp}"
 
-    headers = {
-        "X-SF-Token": token,
-        "Accept": get_accept_header(output_format),
-    }
+    headers = _headers(token, output_format)
 
-    response = requests.get(url, headers=headers, timeout=30)
+    response = _SESSION.get(url, headers=headers, timeout=30)
     return response
 
 
@@ -161,7 +238,7 @@ def get_trace_latest(
     realm: str,
     trace_id: str,
     output_format: str,
-) -> requests.Response:
+) -> Response:
     """
     Get latest segment of a trace.
 
@@ -175,67 +252,174 @@ def get_trace_latest(
         API response
 
     Raises:
-        requests.exceptions.RequestException: On API errors
+        requests.exceptions.RequestException or httpx.HTTPError: On API errors
     """
     url = f"https://api.{realm}.signalfx.com/v2/apm/trace/{trace_id}/latest"
 
-    headers = {
-        "X-SF-Token": token,
-        "Accept": get_accept_header(output_format),
-    }
+    headers = _headers(token, output_format)
 
-    response = requests.get(url, headers=headers, timeout=30)
+    response = _SESSION.get(url, headers=headers, timeout=30)
     return response
 
 
-def handle_response(response: requests.Response, output_format: str) -> None:
+def iter_all_segments(
+    token: str,
+    realm: str,
+    trace_id: str,
+    max_workers: int = 8,
+) -> Iterator[tuple[int, Response | Exception]]:
     """
-    Handle API response, outputting result or raising error.
+    Fetch every segment of a trace concurrently.
+
+    Retrieves the segment timestamp list, then requests each segment from a
+    thread pool sharing the module session. A request error for one segment is
+    yielded in place of its response so the remaining segments still complete.
 
     Args:
-        response: API response object
-        output_format: Output format (json or ndjson)
+        token: Splunk Observability Cloud API token
+        realm: Splunk realm (e.g., us1, eu0)
+        trace_id: Trace ID
+        max_workers: Maximum number of concurrent segment requests
+
+    Yields:
+        (segment_timestamp, response or request exception) tuples in
+        completion order
 
     Raises:
-        SystemExit: On HTTP errors
+        SystemExit: On HTTP errors or invalid JSON from the segment list
+        requests.exceptions.RequestException or httpx.HTTPError: On API errors
+            fetching the list
     """
-    if response.status_code == 404:
-        print("Error: Trace not found", file=sys.stderr)
+    response = get_trace_segments(token, realm, trace_id, "json")
+    check_response(response)
+    try:
+        segments = json_loads(response.content)
+    except ValueError:
+        print("Error: Segment list response is not valid JSON", file=sys.stderr)
         sys.exit(1)
+    if isinstance(segments, dict):
+        segments = segments.get("segments", [])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                get_trace_segment_by_timestamp, token, realm, trace_id, timestamp, "json"
+            ): timestamp
+            for timestamp in segments
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except _REQUEST_ERRORS as e:
+                result = e
+            yield futures[future], result
+
+
+def response_error(
+    response: Response, not_found: str = "Trace not found"
+) -> str | None:
+    """
+    Describe why an API response is not successful.
+
+    Args:
+        response: API response object
+        not_found: Message to use for a 404 response
+
+    Returns:
+        Error message, or None if the response is successful
+    """
+    if response.status_code == 404:
+        return not_found
 
     if response.status_code == 429:
         retry_after = response.headers.get("Retry-After", "unknown")
-        print(
-            f"Error: Rate limit exceeded. Retry after: {retry_after} seconds",
-            file=sys.stderr,
-        )
-        sys.exit(1)
+        return f"Rate limit exceeded. Retry after: {retry_after} seconds"
 
     try:
         response.raise_for_status()
-    except requests.exceptions.HTTPError as e:
-        error_message = f"HTTP error: {e.response.status_code}"
-        try:
-            error_body = e.response.json()
-            if "message" in error_body:
-                error_message += f" - {error_body['message']}"
-        except (ValueError, KeyError):
-            pass
-        print(f"Error: {error_message}", file=sys.stderr)
+    except _HTTP_STATUS_ERRORS as e:
+        return format_http_error(e)
+    return None
+
+
+def check_response(response: Response) -> None:
+    """
+    Exit with an error message if the API response is not successful.
+
+    Args:
+        response: API response object
+
+    Raises:
+        SystemExit: On HTTP errors
+    """
+    error = response_error(response)
+    if error is not None:
+        print(f"Error: {error}", file=sys.stderr)
         sys.exit(1)
 
+
+def output_all_segments(token: str, realm: str, trace_id: str) -> int:
+    """
+    Write every segment of a trace as NDJSON, one line per segment.
+
+    A segment that fails is reported on stderr and skipped; the others are
+    still written.
+
+    Args:
+        token: Splunk Observability Cloud API token
+        realm: Splunk realm (e.g., us1, eu0)
+        trace_id: Trace ID
+
+    Returns:
+        Number of segments that could not be retrieved
+    """
+    failed = 0
+    for segment_timestamp, result in iter_all_segments(token, realm, trace_id):
+        if isinstance(result, Exception):
+            error = f"Request failed: {result}"
+        else:
+            error = response_error(result, not_found="Segment not found")
+        if error is None:
+            try:
+                spans = json_loads(result.content)
+            except ValueError:
+                error = "Response is not valid JSON"
+        if error is not None:
+            print(f"Error: segment {segment_timestamp}: {error}", file=sys.stderr)
+            failed += 1
+            continue
+
+        write_output(dumps_line({"segmentTimestamp": segment_timestamp, "spans": spans}))
+        sys.stdout.buffer.flush()
+    return failed
+
+
+def handle_response(response: Response, output_format: str) -> None:
+    """
+    Handle API response, outputting result or raising error.
+
+    Args:
+        response: API response object
+        output_format: Output format (json or ndjson)
+
+    Raises:
+        SystemExit: On HTTP errors
+    """
+    check_response(response)
+
     # Output based on format
     if output_format == "ndjson":
-        # For NDJSON, output raw text as-is
-        print(response.text)
+        # For NDJSON, output the raw body as-is
+        write_output(response.content)
     else:
         # For JSON, pretty-print
         try:
-            result = response.json()
-            print(json.dumps(result, indent=2))
+            result = json_loads(response.content)
+            write_output(dumps_pretty(result))
         except ValueError:
             # If response is not valid JSON, output raw text
-            print(response.text)
+            # (orjson.JSONDecodeError is a ValueError subclass)
+            write_output(response.content)
 
 
 def main():
@@ -251,6 +435,13 @@ def main():
     realm = os.environ.get("SF_REALM", "us1")
 
     try:
+        if args.all_segments:
+            failed = output_all_segments(token=token, realm=realm, trace_id=args.trace_id)
+            if failed:
+                print(f"Error: {failed} segment(s) could not be retrieved", file=sys.stderr)
+                sys.exit(1)
+            return
+
         # Determine which endpoint to call
         if args.segments:
             response = get_trace_segments(
@@ -278,13 +469,13 @@ def main():
 
         handle_response(response, args.format)
 
-    except requests.exceptions.ConnectionError:
+    except _CONNECT_ERRORS:
         print(f"Error: Could not connect to Splunk API (realm: {realm})", file=sys.stderr)
         sys.exit(1)
-    except requests.exceptions.Timeout:
+    except _TIMEOUT_ERRORS:
         print("Error: Request timed out", file=sys.stderr)
         sys.exit(1)
-    except requests.exceptions.RequestException as e:
+    except _REQUEST_ERRORS as e:
         print(f"Error: Request failed: {e}", file=sys.stderr)
         sys.exit(1)
 